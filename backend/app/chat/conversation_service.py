@@ -1,5 +1,6 @@
 import logging
-from typing import List, Dict, Any, Optional
+import re
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator
 from datetime import datetime
 from app.db.mongodb_models import Conversation, Message, User, UserAnalytics
 from app.schemas.chat import ConversationStartResponse, ChatQueryResponse, ConversationDetailResponse, MessageResponse
@@ -9,6 +10,22 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Characters of the latest reply kept on the conversation for history listings
+LAST_MESSAGE_PREVIEW_CHARS = 120
+
+# Markdown syntax dropped from previews, which are shown as one line of plain text
+_MARKDOWN_LINK = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_MARKDOWN_LINE_PREFIX = re.compile(r"^\s*(?:#{1,6}\s+|>\s*|[-*+]\s+|\d+\.\s+)", re.MULTILINE)
+_MARKDOWN_MARKS = re.compile(r"```\w*|[`*~]|(?<!\w)_+|_+(?!\w)")
+
+
+def message_preview(text: str) -> str:
+    """Reduce a reply to a single line of plain text for history listings."""
+    text = _MARKDOWN_LINK.sub(r"\1", text)
+    text = _MARKDOWN_LINE_PREFIX.sub("", text)
+    text = _MARKDOWN_MARKS.sub("", text)
+    return " ".join(text.split())[:LAST_MESSAGE_PREVIEW_CHARS]
+
 
 class ConversationService:
     """Service for managing conversations and messages."""
@@ -141,22 +158,7 @@ class ConversationService:
         try:
             start_time = datetime.utcnow()
             
-            # Get conversation
-            conversation = await Conversation.get(conversation_id)
-            if not conversation or conversation.user_id != user_id:
-                raise ValueError("Conversation not found or access denied")
-            
-            # Save user message
-            user_msg = Message(
-                conversation_id=conversation_id,
-                role="user",
-                content=user_message,
-                timestamp=datetime.utcnow()
-            )
-            await user_msg.insert()
-            
-            # Get conversation history for context
-            conversation_history = await self._get_conversation_history(conversation_id)
+            conversation, conversation_history = await self._begin_turn(conversation_id, user_message, user_id)
             
             # Process with RAG (document-scoped if applicable)
             if conversation.chat_type == "document" and conversation.selected_document_ids:
@@ -169,28 +171,10 @@ class ConversationService:
             # Calculate response time
             response_time = (datetime.utcnow() - start_time).total_seconds()
             
-            # Save assistant response
-            assistant_msg = Message(
-                conversation_id=conversation_id,
-                role="assistant",
-                content=rag_response["response"],
-                timestamp=datetime.utcnow(),
-                sources=rag_response.get("sources", []),
-                response_time=response_time,
-                token_count=rag_response.get("usage", {}).get("total_tokens", 0)
+            await self._complete_turn(
+                conversation, user_id, rag_response["response"],
+                rag_response.get("sources", []), response_time, rag_response.get("usage", {})
             )
-            await assistant_msg.insert()
-            
-            # Update conversation
-            conversation.message_count += 1
-            conversation.last_message_at = datetime.utcnow()
-            conversation.updated_at = datetime.utcnow()
-            await conversation.save()
-            
-            # Update user analytics
-            await self._update_user_analytics(user_id, "message_sent")
-            
-            logger.info(f"Processed message in conversation {conversation_id}")
             
             return ChatQueryResponse(
                 message=rag_response["response"],
@@ -205,8 +189,132 @@ class ConversationService:
             logger.error(f"Failed to send message: {e}")
             raise
     
-    async def get_conversation(self, conversation_id: str, user_id: str) -> ConversationDetailResponse:
-        """Get a conversation with all its messages."""
+    async def stream_message(
+        self, 
+        conversation_id: str, 
+        user_message: str, 
+        user_id: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Send a message to a conversation and stream the response.
+        
+        Yields {"type": "chunk", "content": ...} events while the answer is
+        generated, then one {"type": "done", ...} event carrying the same
+        fields as ChatQueryResponse (without the message text).
+        """
+        try:
+            start_time = datetime.utcnow()
+            
+            conversation, conversation_history = await self._begin_turn(conversation_id, user_message, user_id)
+            
+            # Retrieve context (document-scoped if applicable)
+            document_ids = conversation.selected_document_ids if conversation.chat_type == "document" else None
+            context, sources = await self._retrieve_context(user_message, user_id, document_ids)
+            
+            # Stream the answer as it is generated
+            chunks = []
+            usage = {}
+            async for event in self.chat_service.stream_response(
+                query=user_message,
+                context=context,
+                conversation_history=conversation_history
+            ):
+                if "content" in event:
+                    chunks.append(event["content"])
+                    yield {"type": "chunk", "content": event["content"]}
+                else:
+                    usage = event["usage"]
+            
+            # Calculate response time
+            response_time = (datetime.utcnow() - start_time).total_seconds()
+            
+            await self._complete_turn(conversation, user_id, "".join(chunks), sources, response_time, usage)
+            
+            yield {
+                "type": "done",
+                "conversation_id": conversation_id,
+                "sources": sources,
+                "response_time": response_time,
+                "token_count": usage.get("total_tokens", 0),
+                "timestamp": datetime.utcnow()
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to stream message: {e}")
+            raise
+    
+    async def _begin_turn(
+        self, 
+        conversation_id: str, 
+        user_message: str, 
+        user_id: str
+    ) -> Tuple[Conversation, List[Dict[str, str]]]:
+        """Check access, save the user message and return the conversation with its history."""
+        # Get conversation
+        conversation = await Conversation.get(conversation_id)
+        if not conversation or conversation.user_id != user_id:
+            raise ValueError("Conversation not found or access denied")
+        
+        # Save user message
+        user_msg = Message(
+            conversation_id=conversation_id,
+            role="user",
+            content=user_message,
+            timestamp=datetime.utcnow()
+        )
+        await user_msg.insert()
+        
+        # Get conversation history for context
+        conversation_history = await self._get_conversation_history(conversation_id)
+        
+        return conversation, conversation_history
+    
+    async def _complete_turn(
+        self, 
+        conversation: Conversation, 
+        user_id: str, 
+        response: str, 
+        sources: List[dict], 
+        response_time: float, 
+        usage: Dict[str, Any]
+    ):
+        """Save the assistant response and update conversation and analytics."""
+        # Save assistant response
+        assistant_msg = Message(
+            conversation_id=str(conversation.id),
+            role="assistant",
+            content=response,
+            timestamp=datetime.utcnow(),
+            sources=sources,
+            response_time=response_time,
+            token_count=usage.get("total_tokens", 0)
+        )
+        await assistant_msg.insert()
+        
+        # Update conversation
+        conversation.message_count += 1
+        conversation.last_message_at = datetime.utcnow()
+        conversation.updated_at = datetime.utcnow()
+        conversation.last_message_preview = message_preview(response)
+        await conversation.save()
+        
+        # Update user analytics
+        await self._update_user_analytics(user_id, "message_sent")
+        
+        logger.info(f"Processed message in conversation {conversation.id}")
+    
+    async def get_conversation(
+        self, 
+        conversation_id: str, 
+        user_id: str, 
+        limit: Optional[int] = None, 
+        before: Optional[datetime] = None
+    ) -> ConversationDetailResponse:
+        """Get a conversation with all its messages, or one page of the latest ones.
+        
+        With a limit, returns up to `limit` messages older than `before` (oldest
+        first) plus whether more remain; the first page also carries the
+        conversation's token total, since the client no longer sees every message.
+        """
         try:
             # Get conversation
             conversation = await Conversation.get(conversation_id)
@@ -222,7 +330,23 @@ class ConversationService:
                 raise ValueError("Conversation not found or access denied")
             
             # Get messages
-            messages = await Message.find(Message.conversation_id == conversation_id).sort("timestamp").to_list()
+            has_more = False
+            total_tokens = None
+            if limit is None:
+                messages = await Message.find(Message.conversation_id == conversation_id).sort("timestamp").to_list()
+            else:
+                query = Message.find(Message.conversation_id == conversation_id)
+                if before is not None:
+                    query = query.find(Message.timestamp < before)
+                else:
+                    total_tokens = int(await Message.find(
+                        Message.conversation_id == conversation_id
+                    ).sum(Message.token_count) or 0)
+                
+                # Fetch one extra to learn whether older messages remain
+                messages = await query.sort("-timestamp").limit(limit + 1).to_list()
+                has_more = len(messages) > limit
+                messages = messages[:limit][::-1]
             
             # Convert to response format
             message_responses = []
@@ -248,7 +372,9 @@ class ConversationService:
                 last_message_at=conversation.last_message_at,
                 message_count=conversation.message_count,
                 is_active=conversation.is_active,
-                messages=message_responses
+                messages=message_responses,
+                has_more=has_more,
+                total_tokens=total_tokens
             )
             
         except Exception as e:
@@ -271,6 +397,7 @@ class ConversationService:
                     "created_at": conv.created_at,
                     "last_message_at": conv.last_message_at,
                     "message_count": conv.message_count,
+                    "last_message_preview": conv.last_message_preview,
                     "chat_type": getattr(conv, 'chat_type', 'universal'),
                     "selected_document_ids": getattr(conv, 'selected_document_ids', []),
                     "document_names": getattr(conv, 'document_names', [])
@@ -329,33 +456,55 @@ class ConversationService:
             logger.error(f"Failed to get conversation history: {e}")
             return []
     
-    async def _process_rag_query(
+    async def _retrieve_context(
         self, 
         query: str, 
         user_id: str, 
-        conversation_history: List[Dict[str, str]]
-    ) -> Dict[str, Any]:
-        """Process a query using RAG pipeline."""
-        try:
+        document_ids: Optional[List[str]] = None
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """Search for relevant content and build the prompt context and source list."""
+        if document_ids:
+            # Search for relevant content within specific documents
+            search_results = await self.vector_service.search_document_scoped_content(
+                query=query,
+                user_id=user_id,
+                document_ids=document_ids,
+                top_k=settings.TOP_K_RESULTS
+            )
+        else:
             # Search for relevant documents
             search_results = await self.vector_service.search_similar_content(
                 query=query,
                 user_id=user_id,
                 top_k=settings.TOP_K_RESULTS
             )
-            
-            # Extract context from search results
-            context = ""
-            sources = []
-            
-            for result in search_results:
-                context += f"\n{result['text']}\n"
-                sources.append({
-                    "document_id": result.get("document_id"),
-                    "filename": result.get("filename"),
-                    "chunk_index": result.get("chunk_index"),
-                    "score": result.get("score")
-                })
+        
+        # Extract context from search results
+        context = ""
+        sources = []
+        
+        for result in search_results:
+            # Document-scoped results keep their fields under metadata
+            fields = result.get("metadata", {}) if document_ids else result
+            context += f"\n{result['text']}\n"
+            sources.append({
+                "document_id": fields.get("document_id"),
+                "filename": fields.get("filename"),
+                "chunk_index": fields.get("chunk_index"),
+                "score": result.get("score")
+            })
+        
+        return context, sources
+    
+    async def _process_rag_query(
+        self, 
+        query: str, 
+        user_id: str, 
+        conversation_history: List[Dict[str, str]]
+    ) -> Dict[str, Any]:
+        """Process a query using RAG pipeline."""
+        try:
+            context, sources = await self._retrieve_context(query, user_id)
             
             # Generate response using OpenAI
             response = await self.chat_service.generate_response(
@@ -383,26 +532,7 @@ class ConversationService:
     ) -> Dict[str, Any]:
         """Process a query using document-scoped RAG pipeline."""
         try:
-            # Search for relevant content within specific documents
-            search_results = await self.vector_service.search_document_scoped_content(
-                query=query,
-                user_id=user_id,
-                document_ids=document_ids,
-                top_k=settings.TOP_K_RESULTS
-            )
-            
-            # Extract context from search results
-            context = ""
-            sources = []
-            
-            for result in search_results:
-                context += f"\n{result['text']}\n"
-                sources.append({
-                    "document_id": result.get("metadata", {}).get("document_id"),
-                    "filename": result.get("metadata", {}).get("filename"),
-                    "chunk_index": result.get("metadata", {}).get("chunk_index"),
-                    "score": result.get("score")
-                })
+            context, sources = await self._retrieve_context(query, user_id, document_ids)
             
             # Generate response using OpenAI
             response = await self.chat_service.generate_response(
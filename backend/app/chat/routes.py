@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
+from datetime import datetime
 import logging
 import hashlib
+import json
 import time
 from app.schemas.chat import (
     MessageIn, MessageOut, ConversationHistory, 
@@ -24,6 +27,9 @@ logger = logging.getLogger(__name__)
 response_cache = {}
 CACHE_TTL = 300  # 5 minutes
 
+# Largest page of messages one conversation request may return
+MAX_MESSAGE_PAGE = 200
+
 
 @router.post("/query", response_model=MessageOut)
 async def chat_query(
@@ -140,6 +146,7 @@ async def get_chat_history(
                 created_at=conv["created_at"],
                 last_message_at=conv["last_message_at"],
                 message_count=conv["message_count"],
+                last_message_preview=conv["last_message_preview"],
                 is_active=True  # Only active conversations are returned
             ))
         
@@ -243,16 +250,61 @@ async def send_message(
         )
 
 
+@router.post("/{conversation_id}/stream")
+async def stream_message(
+    conversation_id: str,
+    message: MessageIn,
+    current_user: User = Depends(get_current_user)
+):
+    """Send a message to a conversation and stream the response as NDJSON events."""
+    events = conversation_service.stream_message(
+        conversation_id=conversation_id,
+        user_message=message.content,
+        user_id=str(current_user.id)
+    )
+    
+    # Pull the first event before responding so access errors still map to status codes
+    try:
+        first_event = await events.__anext__()
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Failed to send message: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to send message"
+        )
+    
+    async def event_lines():
+        yield json.dumps(first_event, default=str) + "\n"
+        try:
+            async for event in events:
+                yield json.dumps(event, default=str) + "\n"
+        except Exception as e:
+            logger.error(f"Failed to stream message: {e}")
+            yield json.dumps({"type": "error", "detail": "Failed to send message"}) + "\n"
+    
+    return StreamingResponse(event_lines(), media_type="application/x-ndjson")
+
+
 @router.get("/{conversation_id}", response_model=ConversationDetailResponse)
 async def get_conversation_detail(
     conversation_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_MESSAGE_PAGE),
+    before: Optional[datetime] = None
 ):
-    """Get a conversation with all its messages."""
+    """Get a conversation with its messages, or its latest `limit` messages before `before`."""
     try:
         result = await conversation_service.get_conversation(
             conversation_id=conversation_id,
-            user_id=str(current_user.id)
+            user_id=str(current_user.id),
+            limit=limit,
+            before=before
         )
         return result
         
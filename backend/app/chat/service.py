@@ -1,5 +1,5 @@
 import openai
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 import logging
 from app.core.config import settings
 
@@ -23,46 +23,55 @@ class OpenAIChatService:
             logger.error(f"Failed to initialize OpenAI client: {e}")
             raise
     
-    async def generate_response(
+    def _build_messages(
         self, 
         query: str, 
         context: str, 
         conversation_history: Optional[List[Dict[str, str]]] = None
-    ) -> Dict[str, Any]:
-        """Generate response using OpenAI LLM with retrieved context."""
-        try:
-            if not self.client:
-                await self.initialize()
-            
-            # Build system prompt
-            system_prompt = """You are a helpful assistant that answers questions based on the provided context. 
+    ) -> List[Dict[str, str]]:
+        """Build the chat completion messages for a query and its retrieved context."""
+        # Build system prompt
+        system_prompt = """You are a helpful assistant that answers questions based on the provided context. 
 Use only the information in the context to answer questions. If the context doesn't contain 
 relevant information, say "I don't have enough information to answer this question based on the provided documents."
 
 Be concise and accurate in your responses."""
-            
-            # Build user prompt with context
-            user_prompt = f"""Context:
+        
+        # Build user prompt with context
+        user_prompt = f"""Context:
 {context}
 
 Question: {query}
 
 Please provide a clear and accurate answer based only on the context above."""
-            
-            # Prepare messages
-            messages = [{"role": "system", "content": system_prompt}]
-            
-            # Add conversation history if provided
-            if conversation_history:
-                messages.extend(conversation_history)
-            
-            # Add current query
-            messages.append({"role": "user", "content": user_prompt})
+        
+        # Prepare messages
+        messages = [{"role": "system", "content": system_prompt}]
+        
+        # Add conversation history if provided
+        if conversation_history:
+            messages.extend(conversation_history)
+        
+        # Add current query
+        messages.append({"role": "user", "content": user_prompt})
+        
+        return messages
+    
+    async def generate_response(
+        self, 
+        query: str, 
+        context: str, 
+        conversation_history: Optional[List[Dict[str, str]]] = None
+    ) -> Dict[str, Any]:
+        """Generate response using OpenAI LLM with retrieved context."""
+        try:
+            if not self.client:
+                await self.initialize()
             
             # Generate response
             response = await self.client.chat.completions.create(
                 model=self.llm_model,
-                messages=messages,
+                messages=self._build_messages(query, context, conversation_history),
                 max_tokens=settings.MAX_OUTPUT_TOKENS,
                 temperature=settings.TEMPERATURE,
                 top_p=settings.TOP_P,
@@ -86,6 +95,51 @@ Please provide a clear and accurate answer based only on the context above."""
             logger.error(f"Failed to generate response: {e}")
             raise
     
+    async def stream_response(
+        self, 
+        query: str, 
+        context: str, 
+        conversation_history: Optional[List[Dict[str, str]]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a response from the OpenAI LLM.
+        
+        Yields {"content": ...} for each text delta, then a final {"usage": {...}}.
+        """
+        try:
+            if not self.client:
+                await self.initialize()
+            
+            stream = await self.client.chat.completions.create(
+                model=self.llm_model,
+                messages=self._build_messages(query, context, conversation_history),
+                max_tokens=settings.MAX_OUTPUT_TOKENS,
+                temperature=settings.TEMPERATURE,
+                top_p=settings.TOP_P,
+                frequency_penalty=settings.FREQUENCY_PENALTY,
+                presence_penalty=settings.PRESENCE_PENALTY,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            
+            usage = None
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield {"content": chunk.choices[0].delta.content}
+                if chunk.usage:
+                    usage = chunk.usage
+            
+            yield {
+                "usage": {
+                    "prompt_tokens": usage.prompt_tokens if usage else 0,
+                    "completion_tokens": usage.completion_tokens if usage else 0,
+                    "total_tokens": usage.total_tokens if usage else 0
+                }
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to stream response: {e}")
+            raise
+    
     # Simple response method removed for production
 
 
@@ -35,6 +35,7 @@ class Conversation(Document):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     last_message_at: Optional[datetime] = None
     message_count: int = 0
+    last_message_preview: Optional[str] = None  # Start of the latest reply, for history lists
     is_active: bool = True
     chat_type: str = "universal"  # "universal" or "document"
     selected_document_ids: List[str] = []  # For document-scoped chats
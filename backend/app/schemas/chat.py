@@ -79,6 +79,7 @@ class ConversationHistory(BaseModel):
     created_at: datetime
     last_message_at: Optional[datetime] = None
     message_count: int
+    last_message_preview: Optional[str] = None
 
 
 class ConversationStartResponse(BaseModel):
@@ -112,6 +113,8 @@ class ConversationDetailResponse(BaseModel):
     selected_document_ids: List[str] = []
     document_names: List[str] = []
     messages: List[MessageResponse]
+    has_more: bool = False  # Older messages exist beyond this page
+    total_tokens: Optional[int] = None  # Set on the first page of a paged fetch
 
 
 # Document Chat Schemas
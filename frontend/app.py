@@ -1,13 +1,54 @@
 """
 RAG Chat Application - Streamlit Frontend
 """
+import html
+import time
+from collections import deque
+from itertools import islice
+from pathlib import Path
 import streamlit as st
-from config import APP_TITLE, APP_ICON, APP_LAYOUT, APP_SIDEBAR_STATE
+from config import (
+    APP_TITLE, APP_ICON, APP_LAYOUT, APP_SIDEBAR_STATE,
+    MAX_MESSAGE_HISTORY, CHAT_HISTORY_PAGE_SIZE
+)
 from components.auth import (
-    login_form, register_form, logout_button, 
-    is_authenticated, show_register
+    auth_forms, is_authenticated, cached_current_user, clear_auth_state
 )
-from components.documents import document_upload, document_list, document_stats
+from components.documents import document_upload, document_list, document_stats, cached_documents
+from utils.api_client import get_api_client
+from utils.chat import Turn, message_html
+from utils.formatting import short_date
+
+ASSETS_DIR = Path(__file__).parent / "assets"
+
+
+# Sidebar menu labels mapped to their page keys
+NAVIGATION_PAGES = {
+    "Universal Chat": "universal_chat",
+    "Document Chat": "document_chat",
+    "Documents": "documents",
+    "Chats": "chat_history",
+    "Profile": "profile",
+    "Logout": "logout",
+}
+
+# Chat controls offered by the action selector
+CHAT_ACTIONS = {
+    "send": "💬 Send",
+    "refresh": "🔄 Refresh",
+    "details": "📊 Details",
+    "email": "📧 Email Chat",
+    "end": "🛑 End Chat",
+}
+
+# Conversations shown per step on the Chats page
+CHAT_HISTORY_WINDOW = 10
+
+# Seconds the loaded chat history is reused before the Chats page refetches it
+CHAT_HISTORY_MAX_AGE = 300
+
+# Chat messages rendered initially, and added per "Load earlier messages" click
+VISIBLE_TURNS_STEP = 30
 
 
 def main():
@@ -20,145 +61,9 @@ def main():
         initial_sidebar_state=APP_SIDEBAR_STATE
     )
     
-    # Custom CSS
-    st.markdown("""
-    <style>
-    .main-header {
-        text-align: center;
-        padding: 1rem 0;
-        border-bottom: 2px solid #e0e0e0;
-        margin-bottom: 2rem;
-        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        border-radius: 10px;
-    }
-    .main-header h1 {
-        color: white;
-        margin: 0;
-        font-size: 2.5rem;
-    }
-    .main-header p {
-        color: #f0f0f0;
-        margin: 0.5rem 0 0 0;
-        font-size: 1.1rem;
-    }
-    .chat-message {
-        padding: 1rem;
-        margin: 0.5rem 0;
-        border-radius: 15px;
-        border-left: 4px solid #1f77b4;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        transition: transform 0.2s ease;
-    }
-    .chat-message:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 4px 8px rgba(0,0,0,0.15);
-    }
-    .user-message {
-        background: linear-gradient(135deg, #e3f2fd 0%, #bbdefb 100%);
-        border-left-color: #2196f3;
-        margin-left: 20%;
-        color: #000000;
-    }
-    .assistant-message {
-        background: linear-gradient(135deg, #f3e5f5 0%, #e1bee7 100%);
-        border-left-color: #9c27b0;
-        margin-right: 20%;
-        color: #000000;
-    }
-    .metric-card {
-        background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
-        padding: 1.5rem;
-        border-radius: 12px;
-        border: 1px solid #dee2e6;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        transition: transform 0.2s ease;
-        color: #000000;
-    }
-    .metric-card:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 4px 8px rgba(0,0,0,0.15);
-    }
-    .metric-card h4 {
-        color: #000000;
-        margin: 0 0 0.5rem 0;
-    }
-    .metric-card h2 {
-        color: #000000;
-        margin: 0.5rem 0;
-    }
-    .metric-card p {
-        color: #000000;
-        margin: 0;
-    }
-    .sidebar .sidebar-content {
-        background: linear-gradient(180deg, #f8f9fa 0%, #e9ecef 100%);
-    }
-    .stButton > button {
-        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        border: none;
-        border-radius: 8px;
-        padding: 0.5rem 1rem;
-        font-weight: 600;
-        transition: all 0.3s ease;
-    }
-    .stButton > button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 4px 8px rgba(0,0,0,0.2);
-    }
-    .stTextInput > div > div > input {
-        border-radius: 8px;
-        border: 2px solid #e0e0e0;
-        padding: 0.5rem;
-        transition: border-color 0.3s ease;
-    }
-    .stTextInput > div > div > input:focus {
-        border-color: #667eea;
-        box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
-    }
-    .conversation-card {
-        background: white;
-        border-radius: 12px;
-        padding: 1rem;
-        margin: 0.5rem 0;
-        border: 1px solid #e0e0e0;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        transition: all 0.3s ease;
-    }
-    .conversation-card:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 4px 8px rgba(0,0,0,0.15);
-        border-color: #667eea;
-    }
-    .status-indicator {
-        display: inline-block;
-        width: 10px;
-        height: 10px;
-        border-radius: 50%;
-        margin-right: 0.5rem;
-    }
-    .status-online {
-        background-color: #4caf50;
-    }
-    .status-offline {
-        background-color: #f44336;
-    }
-    .loading-spinner {
-        display: inline-block;
-        width: 20px;
-        height: 20px;
-        border: 3px solid #f3f3f3;
-        border-top: 3px solid #667eea;
-        border-radius: 50%;
-        animation: spin 1s linear infinite;
-    }
-    @keyframes spin {
-        0% { transform: rotate(0deg); }
-        100% { transform: rotate(360deg); }
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    # Custom CSS, kept in assets/app.css and read from disk once per process.
+    # It is emitted on every run because Streamlit drops elements a run doesn't redraw.
+    st.markdown(f"<style>\n{load_asset('app.css')}</style>", unsafe_allow_html=True)
     
     # Main header removed for cleaner UI
     
@@ -173,10 +78,7 @@ def main():
                 <p style="color: #f0f0f0; margin: 0.5rem 0 0 0; font-size: 0.9rem;">Get Started</p>
             </div>
             """, unsafe_allow_html=True)
-            if st.session_state.get("show_register", False):
-                register_form()
-            else:
-                login_form()
+            auth_forms()
         # User info removed - using greeting in sidebar instead
     
     # Main content
@@ -188,201 +90,68 @@ def main():
         show_main_app()
 
 
+@st.cache_resource
+def load_asset(name: str) -> str:
+    """Read a static file from assets/, once per process."""
+    return (ASSETS_DIR / name).read_text(encoding="utf-8")
+
+
 def show_landing_page():
     """Show landing page for unauthenticated users."""
-    
-    # Hero Section
-    st.markdown("""
-    <div style="text-align: center; padding: 2rem 0; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                border-radius: 15px; margin-bottom: 2rem; color: white;">
-        <h1 style="color: white; font-size: 3rem; margin: 0; text-shadow: 2px 2px 4px rgba(0,0,0,0.3);">🤖 RAG Chat App</h1>
-        <p style="color: #f0f0f0; font-size: 1.3rem; margin: 1rem 0; font-weight: 300;">Intelligent Document Chat with AI</p>
-        <p style="color: #e0e0e0; font-size: 1.1rem; margin: 0;">Upload documents • Ask questions • Get AI-powered answers</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Features Grid
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.markdown("""
-        <div style="background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%); padding: 1.5rem; 
-                    border-radius: 12px; border-left: 4px solid #28a745; margin-bottom: 1rem;">
-            <h3 style="color: #28a745; margin: 0 0 1rem 0;">📄 Smart Document Processing</h3>
-            <ul style="margin: 0; padding-left: 1.2rem; color: #333;">
-                <li>PDF, TXT, DOCX support</li>
-                <li>Intelligent text chunking</li>
-                <li>Vector embeddings</li>
-                <li>Semantic search ready</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown("""
-        <div style="background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%); padding: 1.5rem; 
-                    border-radius: 12px; border-left: 4px solid #007bff; margin-bottom: 1rem;">
-            <h3 style="color: #007bff; margin: 0 0 1rem 0;">💬 AI-Powered Chat</h3>
-            <ul style="margin: 0; padding-left: 1.2rem; color: #333;">
-                <li>RAG technology</li>
-                <li>Context-aware responses</li>
-                <li>Document-specific chat</li>
-                <li>Conversation history</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown("""
-        <div style="background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%); padding: 1.5rem; 
-                    border-radius: 12px; border-left: 4px solid #6f42c1; margin-bottom: 1rem;">
-            <h3 style="color: #6f42c1; margin: 0 0 1rem 0;">🔒 Secure & Modern</h3>
-            <ul style="margin: 0; padding-left: 1.2rem; color: #333;">
-                <li>JWT authentication</li>
-                <li>User profiles</li>
-                <li>Data privacy</li>
-                <li>Real-time updates</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    # How It Works Section
-    st.markdown("""
-    <div style="background: linear-gradient(135deg, #fff3cd 0%, #ffeaa7 100%); padding: 2rem; 
-                border-radius: 15px; margin: 2rem 0; border-left: 5px solid #ffc107;">
-        <h2 style="color: #856404; margin: 0 0 1.5rem 0; text-align: center;">🚀 How It Works</h2>
-        <div style="display: flex; justify-content: space-between; align-items: center; flex-wrap: wrap;">
-            <div style="text-align: center; flex: 1; min-width: 150px; margin: 0.5rem;">
-                <div style="background: white; border-radius: 50%; width: 60px; height: 60px; display: flex; 
-                            align-items: center; justify-content: center; margin: 0 auto 1rem; font-size: 1.5rem;">1️⃣</div>
-                <h4 style="color: #856404; margin: 0;">Upload</h4>
-                <p style="color: #6c5ce7; margin: 0.5rem 0 0; font-size: 0.9rem;">Upload your documents</p>
-            </div>
-            <div style="text-align: center; flex: 1; min-width: 150px; margin: 0.5rem;">
-                <div style="background: white; border-radius: 50%; width: 60px; height: 60px; display: flex; 
-                            align-items: center; justify-content: center; margin: 0 auto 1rem; font-size: 1.5rem;">2️⃣</div>
-                <h4 style="color: #856404; margin: 0;">Process</h4>
-                <p style="color: #6c5ce7; margin: 0.5rem 0 0; font-size: 0.9rem;">AI processes & indexes</p>
-            </div>
-            <div style="text-align: center; flex: 1; min-width: 150px; margin: 0.5rem;">
-                <div style="background: white; border-radius: 50%; width: 60px; height: 60px; display: flex; 
-                            align-items: center; justify-content: center; margin: 0 auto 1rem; font-size: 1.5rem;">3️⃣</div>
-                <h4 style="color: #856404; margin: 0;">Chat</h4>
-                <p style="color: #6c5ce7; margin: 0.5rem 0 0; font-size: 0.9rem;">Ask questions & get answers</p>
-            </div>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Call to Action
-    st.markdown("""
-    <div style="text-align: center; padding: 2rem; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                border-radius: 15px; margin: 2rem 0; color: white;">
-        <h2 style="color: white; margin: 0 0 1rem 0;">Ready to Get Started?</h2>
-        <p style="color: #f0f0f0; font-size: 1.1rem; margin: 0 0 1.5rem 0;">Join thousands of users who are already using AI to chat with their documents!</p>
-        <div style="display: flex; justify-content: center; gap: 1rem; flex-wrap: wrap;">
-            <div style="background: rgba(255,255,255,0.2); padding: 1rem; border-radius: 10px; min-width: 200px;">
-                <h4 style="color: white; margin: 0 0 0.5rem 0;">✨ Free to Use</h4>
-                <p style="color: #e0e0e0; margin: 0; font-size: 0.9rem;">No hidden costs, no subscriptions</p>
-            </div>
-            <div style="background: rgba(255,255,255,0.2); padding: 1rem; border-radius: 10px; min-width: 200px;">
-                <h4 style="color: white; margin: 0 0 0.5rem 0;">🔒 Secure & Private</h4>
-                <p style="color: #e0e0e0; margin: 0; font-size: 0.9rem;">Your data stays private and secure</p>
-            </div>
-        </div>
-        <p style="color: #f0f0f0; font-size: 1rem; margin: 1.5rem 0 0 0; font-weight: 500;">
-            👈 Use the sidebar to <strong>Login</strong> or <strong>Register</strong> and start your AI journey!
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Technology Stack
-    st.markdown("""
-    <div style="background: #f8f9fa; padding: 1.5rem; border-radius: 12px; margin: 1rem 0; border: 1px solid #dee2e6;">
-        <h3 style="color: #495057; margin: 0 0 1rem 0; text-align: center;">🛠️ Powered by Modern Technology</h3>
-        <div style="display: flex; justify-content: center; align-items: center; flex-wrap: wrap; gap: 1rem;">
-            <span style="background: #e3f2fd; color: #1976d2; padding: 0.5rem 1rem; border-radius: 20px; font-weight: 500;">FastAPI</span>
-            <span style="background: #f3e5f5; color: #7b1fa2; padding: 0.5rem 1rem; border-radius: 20px; font-weight: 500;">Streamlit</span>
-            <span style="background: #e8f5e8; color: #388e3c; padding: 0.5rem 1rem; border-radius: 20px; font-weight: 500;">MongoDB</span>
-            <span style="background: #fff3e0; color: #f57c00; padding: 0.5rem 1rem; border-radius: 20px; font-weight: 500;">Pinecone</span>
-            <span style="background: #fce4ec; color: #c2185b; padding: 0.5rem 1rem; border-radius: 20px; font-weight: 500;">OpenAI</span>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    # Hero, features, how-it-works, call to action and tech stack in one element
+    st.markdown(load_asset("landing.html"), unsafe_allow_html=True)
 
 
 def show_main_app():
     """Show main application for authenticated users."""
+    # Imported here so the landing/login page never loads the menu component
+    from streamlit_option_menu import option_menu
+    
     # Initialize session state for current page
     if "current_page" not in st.session_state:
         st.session_state.current_page = "universal_chat"
     
+    # Fetch the user and their documents together on the first run after login;
+    # both are cached, so the greeting and document badge below reuse them
+    if not st.session_state.get("_caches_warmed"):
+        st.session_state._caches_warmed = True
+        token = st.session_state.access_token
+        try:
+            get_api_client().fetch_parallel({
+                "user": lambda: cached_current_user(token),
+                "documents": lambda: cached_documents(token),
+            })
+        except Exception:
+            pass  # Each consumer reports its own failure when it fetches again
+    
     # Left Sidebar with 3 main sections
     with st.sidebar:
         # User Greeting - at the top
         try:
-            from utils.api_client import api_client
-            user_data = api_client.get_user_profile()
-            user_name = user_data.get('name', 'User')
+            user_data = cached_current_user(st.session_state.access_token)
+            user_name = user_data.get('name') or 'User'
             st.markdown(f"### 👋 Hi {user_name}")
         except:
             st.markdown("### 👋 Hi User")
         
         st.markdown("---")
         
-        # Back button - smart navigation
-        if st.button("← Back", use_container_width=True, type="secondary"):
-            current_page = st.session_state.get("current_page", "universal_chat")
-            
-            # Smart back navigation based on current page
-            if current_page == "document_chat":
-                st.session_state.current_page = "universal_chat"
-            elif current_page == "documents":
-                st.session_state.current_page = "universal_chat"
-            elif current_page == "chat_history":
-                st.session_state.current_page = "universal_chat"
-            elif current_page == "profile":
-                st.session_state.current_page = "universal_chat"
-            else:
-                st.session_state.current_page = "universal_chat"
-            
-            st.rerun()
-        
-        st.markdown("---")
-        
-        # Section 1: Universal Chat
-        if st.button("💬 Universal Chat", use_container_width=True, type="primary"):
-            st.session_state.current_page = "universal_chat"
-            st.rerun()
-        
-        # Section 2: Document Chat
-        if st.button("📄 Document Chat", use_container_width=True):
-            st.session_state.current_page = "document_chat"
-            st.rerun()
-        
-        # Section 3: Documents
-        if st.button("📁 Documents", use_container_width=True):
-            st.session_state.current_page = "documents"
-            st.rerun()
-        
-        # Section 4: Chats (renamed from Chat History)
-        if st.button("💬 Chats", use_container_width=True):
-            st.session_state.current_page = "chat_history"
-            st.rerun()
-        
-        st.markdown("---")
-        
-        # Profile and Logout Section
-        if st.button("👤 Profile", use_container_width=True, type="secondary"):
-            st.session_state.current_page = "profile"
-            st.rerun()
-        
-        if st.button("🚪 Logout", use_container_width=True, type="secondary"):
-            # Clear all session state
-            for key in list(st.session_state.keys()):
-                del st.session_state[key]
+        # Single navigation widget; the key follows the current page so
+        # programmatic page changes (e.g. viewing a chat) re-highlight the menu
+        selection = option_menu(
+            menu_title=None,
+            options=list(NAVIGATION_PAGES),
+            icons=["chat", "file-earmark-text", "folder", "chat-dots", "person", "box-arrow-right"],
+            default_index=list(NAVIGATION_PAGES.values()).index(st.session_state.current_page),
+            key=f"main_nav_{st.session_state.current_page}"
+        )
+        
+        if NAVIGATION_PAGES[selection] == "logout":
+            clear_auth_state()
             st.success("Logged out successfully!")
             st.rerun()
+        
+        st.session_state.current_page = NAVIGATION_PAGES[selection]
     
     # Top Right Menu (simplified - no logout needed)
     st.markdown("---")
@@ -426,16 +195,7 @@ def show_universal_chat():
     st.info("🌐 **Universal Mode**: Searching across all your uploaded documents")
     
     # Document Status
-    try:
-        from utils.api_client import api_client
-        documents = api_client.get_documents()
-        doc_count = len(documents)
-        if doc_count > 0:
-            st.success(f"📄 Active Documents: {doc_count}")
-        else:
-            st.warning("📄 No documents uploaded yet. Upload documents to start chatting!")
-    except Exception as e:
-        st.warning("📄 Unable to load document count. Please check your connection.")
+    document_count_badge()
     
     # Chat Interface - Always show input field for Universal Chat
     if "current_conversation_id" not in st.session_state or st.session_state.current_conversation_id is None:
@@ -446,6 +206,19 @@ def show_universal_chat():
     show_chat_interface()
 
 
+@st.fragment(run_every=30)
+def document_count_badge():
+    """Show the active document count, refreshed on its own every 30 seconds."""
+    try:
+        doc_count = len(cached_documents(st.session_state.access_token))
+        if doc_count > 0:
+            st.success(f"📄 Active Documents: {doc_count}")
+        else:
+            st.warning("📄 No documents uploaded yet. Upload documents to start chatting!")
+    except Exception:
+        st.warning("📄 Unable to load document count. Please check your connection.")
+
+
 def show_document_chat():
     """Show document chat interface."""
     
@@ -454,8 +227,7 @@ def show_document_chat():
     
     # Document Selection
     try:
-        from utils.api_client import api_client
-        documents = api_client.get_selectable_documents()
+        documents = get_api_client().get_selectable_documents()
         
         if not documents:
             st.warning("📄 No documents available. Upload documents first!")
@@ -508,128 +280,302 @@ def show_chat_interface():
     if "chat_messages" not in st.session_state or not st.session_state.chat_messages:
         load_conversation_messages(conversation_id)
     
-    # Display messages
-    if st.session_state.chat_messages:
-        for i, message in enumerate(st.session_state.chat_messages):
-            if message["role"] == "user":
-                st.markdown(f"""
-                <div class="chat-message user-message">
-                    <strong>👤 You:</strong> {message["content"]}
-                </div>
-                """, unsafe_allow_html=True)
-            else:
-                st.markdown(f"""
-                <div class="chat-message assistant-message">
-                    <strong>🤖 AI:</strong> {message["content"]}
-                </div>
-                """, unsafe_allow_html=True)
-    
-    # Chat input - use session state to manage input clearing
-    input_key = f"chat_input_{conversation_id}"
+    # Display only the last visible_turns messages across archive + live window
+    archive = st.session_state.chat_messages_archive
+    live = st.session_state.chat_messages
+    start = max(0, len(archive) + len(live) - st.session_state.visible_turns)
     
-    # Initialize input state if not exists
-    if f"input_cleared_{conversation_id}" not in st.session_state:
-        st.session_state[f"input_cleared_{conversation_id}"] = False
+    if start > 0 or st.session_state.chat_messages_has_more:
+        st.button("⬆️ Load earlier messages", on_click=show_earlier_messages)
     
-    # Clear input if needed
-    if st.session_state[f"input_cleared_{conversation_id}"]:
-        user_input = st.text_input("Type your message:", key=input_key, value="")
-        st.session_state[f"input_cleared_{conversation_id}"] = False
-    else:
-        user_input = st.text_input("Type your message:", key=input_key)
+    st.markdown(transcript_html(conversation_id, start), unsafe_allow_html=True)
+    st.session_state._transcript_turns = len(archive) + len(live)
+    
+    chat_controls(conversation_id)
+
+
+@st.fragment
+def chat_controls(conversation_id: str):
+    """Chat input and actions; reruns on its own so sending doesn't redraw the transcript."""
+    # Turns sent since the last full run are drawn here, below the transcript
+    new_turns = turns_from(st.session_state._transcript_turns)
+    if new_turns:
+        st.markdown(
+            "\n".join(chat_bubble_html(turn.role, turn.html) for turn in new_turns),
+            unsafe_allow_html=True
+        )
+    
+    # This run's turn is drawn here in place, so sending doesn't need a rerun
+    placeholder = st.empty()
     
-    col1, col2, col3 = st.columns([1, 1, 1])
+    # Chat input - cleared by the Go callback before the next run
+    input_key = f"chat_input_{conversation_id}"
+    st.text_input("Type your message:", key=input_key)
+    
+    # One action selector and one button instead of a button per action
+    col1, col2 = st.columns([4, 1])
     
     with col1:
-        if st.button("Send", type="primary"):
-            if user_input:
-                send_message(user_input)
-                # Mark input for clearing on next render
-                st.session_state[f"input_cleared_{conversation_id}"] = True
-                st.rerun()
+        st.radio(
+            "Action",
+            options=list(CHAT_ACTIONS),
+            format_func=CHAT_ACTIONS.get,
+            horizontal=True,
+            label_visibility="collapsed",
+            key="chat_action"
+        )
     
     with col2:
-        if st.button("End Chat"):
-            end_current_chat()
-            st.rerun()
+        st.button(
+            "Go", type="primary", use_container_width=True,
+            on_click=queue_chat_action, args=(conversation_id, input_key)
+        )
+    
+    # Run the action queued by the Go button
+    action, message = st.session_state.pop("pending_chat_action", (None, None))
+    if action == "rerun":
+        # Refresh/end replaced the transcript itself, so redraw the whole page
+        st.rerun()
+    elif action == "send":
+        send_message(message, placeholder)
+    elif action == "details":
+        with placeholder.container():
+            show_conversation_details(conversation_id)
+    elif action == "email":
+        email_chat_summary(conversation_id)
+
+
+def queue_chat_action(conversation_id: str, input_key: str):
+    """Go button callback: apply state-only actions, queue the rest for the run."""
+    action = st.session_state.chat_action
+    
+    if action == "send":
+        message = st.session_state.get(input_key, "").strip()
+        st.session_state[input_key] = ""
+        if message:
+            st.session_state.pending_chat_action = ("send", message)
+    elif action == "refresh":
+        refresh_chat(conversation_id)
+        st.session_state.pending_chat_action = ("rerun", None)
+    elif action == "end":
+        end_current_chat()
+        st.session_state.pending_chat_action = ("rerun", None)
+    else:
+        st.session_state.pending_chat_action = (action, None)
+
+
+def show_earlier_messages():
+    """Load earlier button callback: widen the window, fetching older turns when it runs out."""
+    st.session_state.visible_turns += VISIBLE_TURNS_STEP
+    loaded = len(st.session_state.chat_messages_archive) + len(st.session_state.chat_messages)
+    try:
+        if st.session_state.chat_messages_has_more and st.session_state.visible_turns > loaded:
+            fetch_earlier_messages(st.session_state.current_conversation_id)
+    except Exception as e:
+        st.error(f"Failed to load earlier messages: {str(e)}")
+
+
+def fetch_earlier_messages(conversation_id: str):
+    """Fetch the page of messages before the oldest loaded one into the archive."""
+    page = get_api_client().get_conversation(
+        conversation_id,
+        limit=MAX_MESSAGE_HISTORY,
+        before=st.session_state.chat_messages_before
+    )
+    messages = page.get("messages", [])
     
-    with col3:
-        if st.button("📧 Email Chat"):
-            email_chat_summary(conversation_id)
+    st.session_state.chat_messages_archive[:0] = [
+        make_chat_message(msg["role"], msg["content"]) for msg in messages
+    ]
+    st.session_state.chat_messages_has_more = page.get("has_more", False)
+    if messages:
+        st.session_state.chat_messages_before = messages[0]["timestamp"]
+
+
+def transcript_html(conversation_id: str, start: int) -> str:
+    """Return the markup for the visible turns as one block, rebuilt only when they change."""
+    archive = st.session_state.chat_messages_archive
+    live = st.session_state.chat_messages
+    signature = (conversation_id, st.session_state.chat_messages_version, len(archive), len(live), start)
+    
+    cached = st.session_state.get("_transcript")
+    if cached and cached[0] == signature:
+        return cached[1]
+    
+    markup = "\n".join(chat_bubble_html(turn.role, turn.html) for turn in turns_from(start))
+    st.session_state._transcript = (signature, markup)
+    return markup
+
+
+def turns_from(start: int) -> list:
+    """Return the turns from index start on, counting across archive + live window."""
+    archive = st.session_state.chat_messages_archive
+    live = st.session_state.chat_messages
+    return list(archive[start:]) + list(islice(live, max(0, start - len(archive)), None))
+
+
+def render_chat_message(message: Turn):
+    """Render a single chat message bubble."""
+    st.markdown(chat_bubble_html(message.role, message.html), unsafe_allow_html=True)
+
+
+def chat_bubble_html(role: str, body_html: str) -> str:
+    """Return the bubble markup for an already-escaped message body."""
+    # Flush-left on one line: bubbles are joined into one markdown block, where
+    # indented lines would be read as code blocks
+    if role == "user":
+        return f'<div class="chat-message user-message"><strong>👤 You:</strong> {body_html}</div>'
+    return f'<div class="chat-message assistant-message"><strong>🤖 AI:</strong> {body_html}</div>'
 
 
 def show_chat_history_page():
     """Show chat history page."""
     
-    # Chat history
+    # Chat history - fetched one page at a time and kept in session state;
+    # refetched only when a new conversation was started or the copy is old
     try:
-        from utils.api_client import api_client
-        
-        # Get chat history
-        try:
-            chat_history = api_client.get_chat_history()
-            
-            if not chat_history:
-                st.info("No chat history available. Start a conversation in the Chat section!")
-                return
-            
-            # Filter out conversations with 0 messages
-            conversations_with_messages = [
-                conv for conv in chat_history 
-                if conv.get('message_count', 0) > 0
-            ]
-            
-            if not conversations_with_messages:
-                st.info("No conversations with messages found. Start chatting to see your history here!")
-                return
-            
-            # Display conversations
-            for i, conversation in enumerate(conversations_with_messages):
-                # Create simple title
-                title = conversation.get('title', 'Untitled Conversation')
-                display_title = f"💬 {title}"
-                
-                # Simple conversation card
-                col1, col2, col3 = st.columns([3, 1, 1])
-                
-                with col1:
-                    st.write(f"**{display_title}**")
-                    st.caption(f"Created: {conversation.get('created_at', 'Unknown')[:10]} • Messages: {conversation.get('message_count', 0)}")
-                
-                with col2:
-                    if st.button(f"📖 View", key=f"view_{conversation['id']}"):
-                        view_conversation(conversation['id'])
-                
-                with col3:
-                    if st.button(f"🗑️ Delete", key=f"delete_{conversation['id']}"):
-                        delete_conversation(conversation['id'])
-                
-                st.markdown("---")
-        
-        except Exception as e:
-            st.error(f"Error loading chat history: {str(e)}")
+        if "chat_history" not in st.session_state or chat_history_stale():
+            fetch_chat_history_page(reset=True)
+    except Exception as e:
+        st.session_state.pop("chat_history", None)  # Retry on the next run
+        st.error(f"Error loading chat history: {str(e)}")
+        return
+    
+    chat_history = st.session_state.chat_history
+    
+    if not chat_history:
+        st.info("No chat history available. Start a conversation in the Chat section!")
+        return
+    
+    # Filter out conversations with 0 messages
+    conversations_with_messages = conversations_with_messages_loaded()
+    
+    if not conversations_with_messages:
+        st.info("No conversations with messages found. Start chatting to see your history here!")
+        # Older pages may still hold conversations with messages
+        if st.session_state.chat_history_has_more:
+            st.button("⬇️ Show older", on_click=show_older_chat_history)
+        return
+
+    # Display only the most recent window of conversations, as one selector
+    window = st.session_state.setdefault("history_window", CHAT_HISTORY_WINDOW)
+    visible = conversations_with_messages[:window]
+    titles = {conv["id"]: f"💬 {conv.get('title', 'Untitled Conversation')}" for conv in visible}
+    selected = st.radio(
+        "Conversations",
+        options=list(titles),
+        format_func=titles.get,
+        captions=[
+            f"Created: {conv['created_label']} • Messages: {conv.get('message_count', 0)}"
+            + (f"  \n{conv['last_message_preview']}" if conv.get("last_message_preview") else "")
+            for conv in visible
+        ],
+        index=None,
+        key="conv_radio",
+        label_visibility="collapsed"
+    )
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        if st.button("📖 View", disabled=selected is None, use_container_width=True):
+            view_conversation(selected)
+    with col2:
+        st.button(
+            "👀 Show last 3", disabled=selected is None, use_container_width=True,
+            on_click=load_conversation_preview, args=(selected,)
+        )
+    with col3:
+        if st.button("🗑️ Delete", disabled=selected is None, use_container_width=True):
+            delete_conversation(selected)
+    
+    # Message preview, only for a conversation the user asked to peek at
+    preview = st.session_state.get("conversation_previews", {}).get(selected)
+    if preview:
+        for msg in preview:
+            role = "👤 You" if msg.get("role") == "user" else "🤖 AI"
+            st.caption(f"{role}: {msg.get('content', '')[:200]}")
     
+    if len(conversations_with_messages) > window or st.session_state.chat_history_has_more:
+        st.button("⬇️ Show older", on_click=show_older_chat_history)
+
+
+def load_conversation_preview(conversation_id: str):
+    """Show last 3 button callback: fetch the conversation's latest messages once."""
+    previews = st.session_state.setdefault("conversation_previews", {})
+    if conversation_id in previews:
+        return
+    try:
+        page = get_api_client().get_conversation(conversation_id, limit=3)
+        previews[conversation_id] = page.get("messages", [])
+    except Exception as e:
+        st.error(f"Failed to load preview: {str(e)}")
+
+
+def conversations_with_messages_loaded() -> list:
+    """Return the loaded conversations that have at least one message."""
+    return [
+        conv for conv in st.session_state.chat_history
+        if conv.get('message_count', 0) > 0
+    ]
+
+
+def chat_history_stale() -> bool:
+    """Return True (and clear the dirty flag) if the loaded history needs a refetch."""
+    dirty = st.session_state.pop("_history_dirty", False)
+    age = time.monotonic() - st.session_state.get("chat_history_fetched_at", 0)
+    return dirty or age > CHAT_HISTORY_MAX_AGE
+
+
+def fetch_chat_history_page(reset: bool = False):
+    """Fetch the next page of conversations and append it to the session history."""
+    if reset:
+        reset_chat_history()
+    
+    page = get_api_client().get_chat_history(
+        limit=CHAT_HISTORY_PAGE_SIZE,
+        skip=st.session_state.chat_history_cursor
+    )
+    add_chat_history_page(page)
+
+
+def reset_chat_history():
+    """Empty the loaded chat history before fetching it from the first page."""
+    st.session_state.chat_history = []
+    st.session_state.chat_history_cursor = 0
+    st.session_state.history_window = CHAT_HISTORY_WINDOW
+    st.session_state.chat_history_fetched_at = time.monotonic()
+    st.session_state.pop("_history_dirty", None)
+    st.session_state.pop("conversation_previews", None)
+
+
+def add_chat_history_page(page: list):
+    """Append a fetched page of conversations to the session history."""
+    st.session_state.chat_history.extend(page)
+    st.session_state.chat_history_cursor += len(page)
+    st.session_state.chat_history_has_more = len(page) == CHAT_HISTORY_PAGE_SIZE
+
+
+def show_older_chat_history():
+    """Show older button callback: widen the window, fetching another page when it runs out."""
+    st.session_state.history_window += CHAT_HISTORY_WINDOW
+    try:
+        if (st.session_state.chat_history_has_more and
+                st.session_state.history_window > len(conversations_with_messages_loaded())):
+            fetch_chat_history_page()
     except Exception as e:
-        st.error(f"Error loading user info: {str(e)}")
+        st.error(f"Error loading chat history: {str(e)}")
 
 
 def view_conversation(conversation_id: str):
     """View a specific conversation."""
     try:
-        from utils.api_client import api_client
-        conversation = api_client.get_conversation(conversation_id)
+        conversation = get_api_client().get_conversation(conversation_id, limit=MAX_MESSAGE_HISTORY)
         
         st.session_state.current_conversation_id = conversation_id
         st.session_state.conversation_type = conversation.get("chat_type", "universal")
-        st.session_state.chat_messages = []
-        
-        # Load messages
-        messages = conversation.get("messages", [])
-        for msg in messages:
-            st.session_state.chat_messages.append({
-                "role": msg["role"],
-                "content": msg["content"]
-            })
+        
+        # Load the latest page of messages
+        reset_chat_messages_page(conversation)
         
         # Switch to appropriate chat page based on conversation type
         if conversation.get("chat_type") == "document":
@@ -645,8 +591,16 @@ def view_conversation(conversation_id: str):
 def delete_conversation(conversation_id: str):
     """Delete a conversation."""
     try:
-        from utils.api_client import api_client
-        api_client.delete_conversation(conversation_id)
+        get_api_client().delete_conversation(conversation_id)
+        
+        # Drop it from the loaded history; later pages shift up by one
+        if "chat_history" in st.session_state:
+            st.session_state.chat_history = [
+                conv for conv in st.session_state.chat_history
+                if conv["id"] != conversation_id
+            ]
+            st.session_state.chat_history_cursor -= 1
+        
         st.success("Conversation deleted successfully!")
         st.rerun()
         
@@ -657,8 +611,8 @@ def delete_conversation(conversation_id: str):
 def show_conversation_details(conversation_id: str):
     """Show detailed conversation information."""
     try:
-        from utils.api_client import api_client
-        conversation = api_client.get_conversation(conversation_id)
+        # One message is enough: counts come from the conversation metadata
+        conversation = get_api_client().get_conversation(conversation_id, limit=1)
         
         st.subheader("📊 Conversation Details")
         
@@ -670,8 +624,9 @@ def show_conversation_details(conversation_id: str):
             st.write(f"**Created:** {conversation.get('created_at', 'Unknown')}")
         
         with col2:
-            st.write(f"**Messages:** {len(conversation.get('messages', []))}")
+            st.write(f"**Messages:** {conversation.get('message_count', 0)}")
             st.write(f"**Last Updated:** {conversation.get('updated_at', 'Unknown')}")
+            st.write(f"**Tokens Used:** {conversation.get('total_tokens') or 0}")
             st.write(f"**Status:** Active")
         
         # Show sources if available
@@ -688,75 +643,26 @@ def show_profile_page():
     """Show user profile page with statistics."""
     
     try:
-        from utils.api_client import api_client
-        user_data = api_client.get_user_profile()
+        user_data = get_api_client().get_user_profile()
         
         # User Information Section
         st.subheader("📋 Personal Information")
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown(f"""
-            <div class="metric-card">
-                <h4>👤 Name</h4>
-                <p>{user_data.get('name', 'Not set')}</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            st.markdown(f"""
-            <div class="metric-card">
-                <h4>📧 Email</h4>
-                <p>{user_data.get('email', 'Unknown')}</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            st.markdown(f"""
-            <div class="metric-card">
-                <h4>📅 Member Since</h4>
-                <p>{user_data.get('created_at', 'Unknown')[:10]}</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            st.markdown(f"""
-            <div class="metric-card">
-                <h4>🔐 Account Status</h4>
-                <p>✅ Active</p>
-            </div>
-            """, unsafe_allow_html=True)
+        st.markdown(metric_grid([
+            metric_card("👤 Name", user_data.get('name', 'Not set')),
+            metric_card("📧 Email", user_data.get('email', 'Unknown')),
+            metric_card("📅 Member Since", short_date(user_data.get('created_at'))),
+            metric_card("🔐 Account Status", "✅ Active"),
+        ], columns=2), unsafe_allow_html=True)
         
         st.markdown("---")
         
         # Statistics Section
         st.subheader("📊 Usage Statistics")
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.markdown(f"""
-            <div class="metric-card">
-                <h4>📄 Documents</h4>
-                <h2>{user_data.get('document_count', 0)}</h2>
-                <p>Uploaded</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            st.markdown(f"""
-            <div class="metric-card">
-                <h4>💬 Chats</h4>
-                <h2>{user_data.get('chat_count', 0)}</h2>
-                <p>Created</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col3:
-            st.markdown(f"""
-            <div class="metric-card">
-                <h4>💭 Messages</h4>
-                <h2>{user_data.get('message_count', 0)}</h2>
-                <p>Total</p>
-            </div>
-            """, unsafe_allow_html=True)
+        st.markdown(metric_grid([
+            metric_card("📄 Documents", user_data.get('document_count', 0), "Uploaded"),
+            metric_card("💬 Chats", user_data.get('chat_count', 0), "Created"),
+            metric_card("💭 Messages", user_data.get('message_count', 0), "Total"),
+        ], columns=3), unsafe_allow_html=True)
         
         st.markdown("---")
         
@@ -780,14 +686,10 @@ def show_profile_page():
         col1, col2 = st.columns(2)
         
         with col1:
-            if st.button("← Back to Chat", type="primary"):
-                st.session_state.current_page = "universal_chat"
-                st.rerun()
+            st.button("← Back to Chat", type="primary", on_click=go_to_page, args=("universal_chat",))
         
         with col2:
-            if st.button("🗑️ Delete Profile", type="secondary"):
-                st.session_state.show_delete_confirmation = True
-                st.rerun()
+            st.button("🗑️ Delete Profile", type="secondary", on_click=set_delete_confirmation, args=(True,))
         
         # Delete Profile Confirmation Dialog
         if st.session_state.get("show_delete_confirmation", False):
@@ -812,30 +714,49 @@ def show_profile_page():
                     delete_user_profile()
             
             with col2:
-                if st.button("❌ Cancel", type="secondary"):
-                    st.session_state.show_delete_confirmation = False
-                    st.rerun()
+                st.button("❌ Cancel", type="secondary", on_click=set_delete_confirmation, args=(False,))
             
             with col3:
-                if st.button("🔒 Keep Profile", type="secondary"):
-                    st.session_state.show_delete_confirmation = False
-                    st.rerun()
+                st.button("🔒 Keep Profile", type="secondary", on_click=set_delete_confirmation, args=(False,))
     
     except Exception as e:
         st.error(f"Error loading profile: {str(e)}")
-        if st.button("← Back to Chat", type="primary"):
-            st.session_state.current_page = "universal_chat"
-            st.rerun()
+        st.button("← Back to Chat", type="primary", on_click=go_to_page, args=("universal_chat",))
+
+
+def go_to_page(page: str):
+    """Button callback: switch pages before the rerun the click triggers."""
+    st.session_state.current_page = page
+
+
+def set_delete_confirmation(show: bool):
+    """Button callback: show or hide the delete-profile confirmation."""
+    st.session_state.show_delete_confirmation = show
+
+
+def metric_card(title: str, value, sub: str = "") -> str:
+    """Return the HTML for a profile metric card."""
+    value = html.escape(str(value))
+    if sub:
+        return f'<div class="metric-card"><h4>{title}</h4><h2>{value}</h2><p>{sub}</p></div>'
+    return f'<div class="metric-card"><h4>{title}</h4><p>{value}</p></div>'
+
+
+def metric_grid(cards: list, columns: int) -> str:
+    """Lay out metric cards in a grid so a whole section is one markdown element."""
+    return (
+        f'<div class="metric-grid" style="grid-template-columns: repeat({columns}, 1fr);">'
+        f'{"".join(cards)}</div>'
+    )
 
 
 def start_new_conversation():
     """Start a new conversation."""
     try:
-        from utils.api_client import api_client
-        result = api_client.start_conversation()
+        result = get_api_client().start_conversation()
         st.session_state.current_conversation_id = result["conversation_id"]
         st.session_state.conversation_type = "universal"  # Set conversation type
-        st.session_state.chat_messages = []
+        reset_chat_messages()
         st.success("New conversation started!")
     except Exception as e:
         st.error(f"Failed to start conversation: {str(e)}")
@@ -844,11 +765,10 @@ def start_new_conversation():
 def start_document_conversation(document_ids: list):
     """Start a new document-scoped conversation."""
     try:
-        from utils.api_client import api_client
-        result = api_client.start_document_conversation(document_ids)
+        result = get_api_client().start_document_conversation(document_ids)
         st.session_state.current_conversation_id = result["conversation_id"]
         st.session_state.conversation_type = "document"  # Set conversation type
-        st.session_state.chat_messages = []
+        reset_chat_messages()
         st.success(f"Document chat started with {len(document_ids)} document(s)!")
         st.rerun()
     except Exception as e:
@@ -858,55 +778,119 @@ def start_document_conversation(document_ids: list):
 def load_conversation_messages(conversation_id: str):
     """Load messages for a conversation."""
     try:
-        from utils.api_client import api_client
-        conversation = api_client.get_conversation(conversation_id)
-        
-        # Extract messages from conversation
-        messages = conversation.get("messages", [])
-        st.session_state.chat_messages = []
+        conversation = get_api_client().get_conversation(conversation_id, limit=MAX_MESSAGE_HISTORY)
         
-        for msg in messages:
-            st.session_state.chat_messages.append({
-                "role": msg["role"],
-                "content": msg["content"]
-            })
+        # Extract the latest page of messages from conversation
+        reset_chat_messages_page(conversation)
             
     except Exception as e:
         # If conversation doesn't exist or has no messages, initialize empty
         if "not found" in str(e).lower() or "404" in str(e):
-            st.session_state.chat_messages = []
+            reset_chat_messages()
         else:
             st.error(f"Failed to load conversation messages: {str(e)}")
-            st.session_state.chat_messages = []
+            reset_chat_messages()
 
 
-def send_message(message: str):
-    """Send a message to the current conversation."""
+def refresh_chat(conversation_id: str):
+    """Reload the conversation, and the Chats page history if loaded, in one round trip."""
+    if "chat_history" not in st.session_state:
+        load_conversation_messages(conversation_id)
+        return
+    
+    try:
+        results = get_api_client().get_history_and_conversation(
+            conversation_id,
+            history_limit=CHAT_HISTORY_PAGE_SIZE,
+            message_limit=MAX_MESSAGE_HISTORY
+        )
+        reset_chat_messages_page(results["conversation"])
+        reset_chat_history()
+        add_chat_history_page(results["history"])
+    except Exception as e:
+        st.error(f"Failed to refresh conversation: {str(e)}")
+
+
+def reset_chat_messages(messages: list = ()):
+    """Replace the chat window, archiving messages beyond the live limit."""
+    turns = [make_chat_message(msg["role"], msg["content"]) for msg in messages]
+    split = max(0, len(turns) - MAX_MESSAGE_HISTORY)
+    
+    st.session_state.chat_messages = deque(turns[split:], maxlen=MAX_MESSAGE_HISTORY)
+    st.session_state.chat_messages_archive = turns[:split]
+    # Bumped on every reset so cached transcript markup is never reused across loads
+    st.session_state.chat_messages_version = st.session_state.get("chat_messages_version", 0) + 1
+    st.session_state.visible_turns = VISIBLE_TURNS_STEP
+    st.session_state.chat_messages_has_more = False
+    st.session_state.chat_messages_before = messages[0]["timestamp"] if messages else None
+    
+    # Running token total, kept up to date by send_message()
+    st.session_state.chat_token_total = sum(msg.get("token_count") or 0 for msg in messages)
+
+
+def reset_chat_messages_page(conversation: dict):
+    """Replace the chat window with the latest page of a conversation fetched with a limit."""
+    reset_chat_messages(conversation.get("messages", []))
+    st.session_state.chat_messages_has_more = conversation.get("has_more", False)
+    if conversation.get("total_tokens") is not None:
+        st.session_state.chat_token_total = conversation["total_tokens"]
+
+
+def append_chat_message(role: str, content: str):
+    """Append a message to the live window, moving the oldest out when full."""
+    live = st.session_state.chat_messages
+    if len(live) == live.maxlen:
+        st.session_state.chat_messages_archive.append(live[0])
+    live.append(make_chat_message(role, content))
+
+
+def make_chat_message(role: str, content: str) -> Turn:
+    """Build a chat turn with its HTML-escaped content precomputed for rendering."""
+    return Turn(role=role, content=content, html=message_html(content))
+
+
+def send_message(message: str, placeholder):
+    """Send a message to the current conversation, drawing the new turn into placeholder."""
     try:
-        from utils.api_client import api_client
         conversation_id = st.session_state.current_conversation_id
         
-        # Add user message to session state
-        st.session_state.chat_messages.append({
-            "role": "user",
-            "content": message
-        })
-        
-        # Show loading state
-        with st.spinner("🤖 AI is thinking..."):
-            # Send to backend
-            response = api_client.send_message(conversation_id, message)
+        with placeholder.container():
+            # Add user message to session state
+            append_chat_message("user", message)
+            render_chat_message(st.session_state.chat_messages[-1])
+            
+            # Stream the answer into its bubble as chunks arrive; the same
+            # placeholder shows the status until the first chunk
+            reply = st.empty()
+            reply.markdown("_🤖 AI is thinking..._")
+            chunks, escaped_chunks = [], []
+            for event in get_api_client().stream_message(conversation_id, message):
+                if event["type"] == "chunk":
+                    chunks.append(event["content"])
+                    escaped_chunks.append(message_html(event["content"]))
+                    reply.markdown(
+                        chat_bubble_html("assistant", "".join(escaped_chunks)),
+                        unsafe_allow_html=True
+                    )
+                elif event["type"] == "done":
+                    st.session_state.chat_token_total += event.get("token_count") or 0
             
-        # Add assistant response to session state
-        st.session_state.chat_messages.append({
-            "role": "assistant",
-            "content": response["message"]
-        })
+            # Add assistant response to session state
+            append_chat_message("assistant", "".join(chunks))
+            reply.empty()
+            render_chat_message(st.session_state.chat_messages[-1])
+        
+        # A conversation's first exchange makes it show up on the Chats page
+        if "chat_history" in st.session_state and not any(
+            conv["id"] == conversation_id and conv.get("message_count", 0) > 0
+            for conv in st.session_state.chat_history
+        ):
+            st.session_state._history_dirty = True
         
     except Exception as e:
-        st.error(f"Failed to send message: {str(e)}")
+        placeholder.error(f"Failed to send message: {str(e)}")
         # Remove the user message if sending failed
-        if st.session_state.chat_messages and st.session_state.chat_messages[-1]["role"] == "user":
+        if st.session_state.chat_messages and st.session_state.chat_messages[-1].role == "user":
             st.session_state.chat_messages.pop()
 
 
@@ -914,15 +898,14 @@ def end_current_chat():
     """End the current chat session."""
     st.session_state.current_conversation_id = None
     st.session_state.conversation_type = None
-    st.session_state.chat_messages = []
+    reset_chat_messages()
     st.success("Chat session ended!")
 
 
 def email_chat_summary(conversation_id: str):
     """Send chat summary via email."""
     try:
-        from utils.api_client import api_client
-        result = api_client.email_chat_summary(conversation_id)
+        result = get_api_client().email_chat_summary(conversation_id)
         st.success(result.get("message", "Chat summary sent to your email!"))
     except Exception as e:
         st.error(f"Failed to send email: {str(e)}")
@@ -931,13 +914,10 @@ def email_chat_summary(conversation_id: str):
 def delete_user_profile():
     """Delete user profile and all associated data."""
     try:
-        from utils.api_client import api_client
-        result = api_client.delete_profile()
+        result = get_api_client().delete_profile()
         
         if result.get("message"):
-            # Clear all session state
-            for key in list(st.session_state.keys()):
-                del st.session_state[key]
+            clear_auth_state()
             
             # Show success message
             st.success("✅ Profile deleted successfully!")
@@ -954,33 +934,5 @@ def delete_user_profile():
         st.session_state.show_delete_confirmation = False
 
 
-def logout_user():
-    """Logout the current user."""
-    # Clear all session state variables
-    if "access_token" in st.session_state:
-        del st.session_state.access_token
-    if "user_email" in st.session_state:
-        del st.session_state.user_email
-    if "user_id" in st.session_state:
-        del st.session_state.user_id
-    if "current_conversation_id" in st.session_state:
-        del st.session_state.current_conversation_id
-    if "conversation_type" in st.session_state:
-        del st.session_state.conversation_type
-    if "chat_messages" in st.session_state:
-        del st.session_state.chat_messages
-    if "user_documents" in st.session_state:
-        del st.session_state.user_documents
-    if "show_profile" in st.session_state:
-        del st.session_state.show_profile
-    if "current_page" in st.session_state:
-        del st.session_state.current_page
-    if "show_register" in st.session_state:
-        del st.session_state.show_register
-    
-    st.success("Logged out successfully!")
-    st.rerun()  # Refresh the page to show login form
-
-
 if __name__ == "__main__":
     main()
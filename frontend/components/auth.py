@@ -2,7 +2,33 @@
 Authentication Components
 """
 import streamlit as st
-from utils.api_client import api_client
+from utils.api_client import get_api_client
+
+api_client = get_api_client()
+
+# Session state owned by the login page; every other key belongs to the
+# logged-in user (including widget keys such as chat_input_<id>) and is
+# dropped on logout
+LOGIN_SESSION_KEYS = frozenset({"auth_mode", "_next_auth_mode"})
+
+
+def auth_forms():
+    """Display a Login/Register switch and the matching form."""
+    if "_next_auth_mode" in st.session_state:
+        st.session_state.auth_mode = st.session_state.pop("_next_auth_mode")
+    
+    mode = st.radio(
+        "Account",
+        ["Login", "Register"],
+        horizontal=True,
+        key="auth_mode",
+        label_visibility="collapsed"
+    )
+    
+    if mode == "Register":
+        register_form()
+    else:
+        login_form()
 
 
 def login_form():
@@ -28,19 +54,11 @@ def login_form():
             help="Enter your account password"
         )
         
-        col1, col2 = st.columns([1, 1])
-        with col1:
-            login_button = st.form_submit_button(
-                "🚀 Login", 
-                use_container_width=True,
-                type="primary"
-            )
-        with col2:
-            register_button = st.form_submit_button(
-                "📝 Register", 
-                use_container_width=True,
-                type="secondary"
-            )
+        login_button = st.form_submit_button(
+            "🚀 Login", 
+            use_container_width=True,
+            type="primary"
+        )
     
     if login_button:
         if email and password:
@@ -56,10 +74,6 @@ def login_form():
                     st.error(f"❌ Login failed: {str(e)}")
         else:
             st.error("⚠️ Please fill in all fields")
-    
-    if register_button:
-        st.session_state.show_register = True
-        st.rerun()
 
 
 def register_form():
@@ -96,19 +110,11 @@ def register_form():
             help="Re-enter your password to confirm"
         )
         
-        col1, col2 = st.columns([1, 1])
-        with col1:
-            register_button = st.form_submit_button(
-                "🚀 Create Account", 
-                use_container_width=True,
-                type="primary"
-            )
-        with col2:
-            login_button = st.form_submit_button(
-                "🔐 Login", 
-                use_container_width=True,
-                type="secondary"
-            )
+        register_button = st.form_submit_button(
+            "🚀 Create Account", 
+            use_container_width=True,
+            type="primary"
+        )
     
     if register_button:
         if all([name, email, password, confirm_password]):
@@ -117,7 +123,8 @@ def register_form():
                     try:
                         response = api_client.register(email, password, name)
                         st.success("🎉 Registration successful! You can now login.")
-                        st.session_state.show_register = False
+                        # The mode radio is already drawn; switch it on the next run
+                        st.session_state._next_auth_mode = "Login"
                         st.rerun()
                     except Exception as e:
                         st.error(f"❌ Registration failed: {str(e)}")
@@ -125,20 +132,19 @@ def register_form():
                 st.error("⚠️ Passwords do not match. Please try again.")
         else:
             st.error("⚠️ Please fill in all fields")
-    
-    if login_button:
-        st.session_state.show_register = False
-        st.rerun()
 
 
-def logout_button():
-    """Display logout button."""
-    if st.button("🚪 Logout", use_container_width=True):
-        # Clear session state
-        for key in list(st.session_state.keys()):
-            del st.session_state[key]
-        st.success("Logged out successfully!")
-        st.rerun()
+@st.cache_data(ttl=300, show_spinner=False)
+def cached_current_user(token: str) -> dict:
+    """Get current user information, cached per access token."""
+    return api_client.get_current_user()
+
+
+def clear_auth_state():
+    """Drop the logged-in user's session state and cached user details."""
+    for key in [key for key in st.session_state if key not in LOGIN_SESSION_KEYS]:
+        del st.session_state[key]
+    cached_current_user.clear()
 
 
 def user_info():
@@ -146,7 +152,7 @@ def user_info():
     if "user_email" in st.session_state:
         # Get user details
         try:
-            user_data = api_client.get_current_user()
+            user_data = cached_current_user(st.session_state.access_token)
             # Display name or email as fallback
             display_name = user_data.get('name') or user_data.get('email', 'User')
             st.info(f"👤 Logged in as: {display_name}")
@@ -161,11 +167,6 @@ def is_authenticated():
     return "access_token" in st.session_state and "user_email" in st.session_state
 
 
-def show_register():
-    """Show register form instead of login form."""
-    register_form()
-
-
 def require_auth():
     """Decorator to require authentication for a function."""
     if not is_authenticated():
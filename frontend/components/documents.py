@@ -2,10 +2,22 @@
 Document Management Components
 """
 import streamlit as st
-from utils.api_client import api_client
+from utils.api_client import get_api_client
 from components.auth import require_auth
 import pandas as pd
 
+api_client = get_api_client()
+
+# Documents shown per table page once a list is long enough to paginate
+DOCUMENTS_PAGE_SIZE = 50
+PAGINATE_DOCUMENTS_OVER = 100
+
+
+@st.cache_data(ttl=30, max_entries=32, show_spinner=False)
+def cached_documents(token: str) -> dict:
+    """Get the user's documents keyed by ID, cached per access token."""
+    return {doc["id"]: doc for doc in api_client.get_documents()}
+
 
 def document_upload():
     """Document upload interface."""
@@ -30,7 +42,7 @@ def document_upload():
             return
         
         # Show file info
-        file_size_mb = len(uploaded_file.getvalue()) / (1024 * 1024)
+        file_size_mb = uploaded_file.size / (1024 * 1024)
         st.info(f"📁 **File:** {uploaded_file.name} ({file_size_mb:.1f} MB)")
         
         # Upload button
@@ -45,8 +57,7 @@ def document_upload():
                 st.write(f"**Status:** {response['processing_status']}")
                 
                 # Refresh document list and clear cache
-                if "user_documents" in st.session_state:
-                    del st.session_state.user_documents
+                cached_documents.clear()
                 st.rerun()
                 
             except Exception as e:
@@ -61,30 +72,25 @@ def document_list():
     st.subheader("📚 Your Documents")
     
     try:
-        # Check if documents are cached in session state
-        if "user_documents" not in st.session_state:
-            st.session_state.user_documents = api_client.get_documents()
-        
-        documents = st.session_state.user_documents
+        doc_by_id = cached_documents(st.session_state.access_token)
+        documents = doc_by_id.values()
         
         if not documents:
             st.info("No documents uploaded yet. Upload some documents to start chatting!")
             return
         
-        # Create DataFrame for better display
-        df_data = []
-        for doc in documents:
-            df_data.append({
-                "Filename": doc["original_filename"],
-                "Type": doc["file_type"].upper(),
-                "Size (MB)": f"{doc['file_size'] / (1024*1024):.1f}",
-                "Chunks": doc["chunk_count"],
-                "Status": doc["processing_status"],
-                "Uploaded": doc["upload_timestamp"][:10],  # Just date
-                "ID": doc["id"]
-            })
-        
-        df = pd.DataFrame(df_data)
+        # Build the table once per distinct document list
+        df = document_frame(tuple(
+            (doc["id"], doc["original_filename"], doc["file_type"], doc["file_size"],
+             doc["chunk_count"], doc["processing_status"], doc["upload_timestamp"])
+            for doc in documents
+        ))
+        
+        # Long lists are shown a page at a time
+        if len(df) > PAGINATE_DOCUMENTS_OVER:
+            pages = -(-len(df) // DOCUMENTS_PAGE_SIZE)
+            page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1)
+            df = df.iloc[(page - 1) * DOCUMENTS_PAGE_SIZE:page * DOCUMENTS_PAGE_SIZE]
         
         # Display documents
         st.dataframe(
@@ -95,31 +101,29 @@ def document_list():
                 "ID": st.column_config.TextColumn("ID", width="small"),
                 "Filename": st.column_config.TextColumn("Filename", width="medium"),
                 "Type": st.column_config.TextColumn("Type", width="small"),
-                "Size (MB)": st.column_config.TextColumn("Size", width="small"),
+                "Size (MB)": st.column_config.NumberColumn("Size", width="small", format="%.1f MB"),
                 "Chunks": st.column_config.NumberColumn("Chunks", width="small"),
                 "Status": st.column_config.TextColumn("Status", width="small"),
-                "Uploaded": st.column_config.TextColumn("Uploaded", width="small")
+                "Uploaded": st.column_config.DatetimeColumn("Uploaded", width="small", format="YYYY-MM-DD")
             }
         )
         
         # Refresh button
         col1, col2 = st.columns([1, 4])
         with col1:
-            if st.button("🔄 Refresh", help="Refresh document list"):
-                if "user_documents" in st.session_state:
-                    del st.session_state.user_documents
-                st.rerun()
+            st.button("🔄 Refresh", help="Refresh document list", on_click=refresh_documents)
         
         # Document actions
         st.subheader("🔧 Document Actions")
         
-        # Select document for actions
-        selected_doc = st.selectbox(
+        # Select document for actions; options are IDs, which are cheap to hash
+        selected_id = st.selectbox(
             "Select document to manage:",
-            options=documents,
-            format_func=lambda x: f"{x['original_filename']} ({x['file_type'].upper()})",
+            options=list(doc_by_id),
+            format_func=lambda doc_id: f"{doc_by_id[doc_id]['original_filename']} ({doc_by_id[doc_id]['file_type'].upper()})",
             key="selected_document"
         )
+        selected_doc = doc_by_id.get(selected_id)
         
         if selected_doc:
             col1, col2 = st.columns([1, 1])
@@ -130,9 +134,8 @@ def document_list():
             
             with col2:
                 if st.button("🗑️ Delete Document", use_container_width=True):
-                    # Store document ID for deletion
+                    # Store document ID for deletion; the confirmation below picks it up
                     st.session_state.document_to_delete = selected_doc["id"]
-                    st.rerun()
         
         # Handle document deletion confirmation
         if "document_to_delete" in st.session_state:
@@ -145,22 +148,49 @@ def document_list():
                         response = api_client.delete_document(st.session_state.document_to_delete)
                         st.success("✅ Document deleted successfully!")
                         # Clear cache and reset state
-                        if "user_documents" in st.session_state:
-                            del st.session_state.user_documents
+                        cached_documents.clear()
                         del st.session_state.document_to_delete
                         st.rerun()
                     except Exception as e:
                         st.error(f"❌ Delete failed: {str(e)}")
             
             with col2:
-                if st.button("❌ Cancel"):
-                    del st.session_state.document_to_delete
-                    st.rerun()
+                st.button("❌ Cancel", on_click=cancel_document_delete)
     
     except Exception as e:
         st.error(f"Error loading documents: {str(e)}")
 
 
+@st.cache_data(max_entries=32, show_spinner=False)
+def document_frame(docs: tuple) -> pd.DataFrame:
+    """Build the documents table from (id, filename, type, size, chunks, status, uploaded) rows."""
+    ids, filenames, file_types, sizes, chunks, statuses, uploaded = zip(*docs)
+    
+    # One list per column; sizes and upload times stay raw (float, datetime)
+    # and are formatted by the column config in the browser, which also sorts
+    # them properly. The numeric columns are narrowed to 32-bit since the
+    # frame is display-only and shipped to the browser.
+    return pd.DataFrame({
+        "Filename": list(filenames),
+        "Type": [file_type.upper() for file_type in file_types],
+        "Size (MB)": [size / (1024*1024) for size in sizes],
+        "Chunks": list(chunks),
+        "Status": list(statuses),
+        "Uploaded": pd.to_datetime(list(uploaded), format="ISO8601"),
+        "ID": list(ids)
+    }).astype({"Chunks": "int32", "Size (MB)": "float32"}, copy=False)
+
+
+def refresh_documents():
+    """Refresh button callback: drop the cached list so this run refetches it."""
+    cached_documents.clear()
+
+
+def cancel_document_delete():
+    """Cancel button callback: dismiss the delete confirmation."""
+    st.session_state.pop("document_to_delete", None)
+
+
 def show_document_details(document):
     """Show detailed information about a document."""
     st.subheader(f"📄 {document['original_filename']}")
@@ -197,32 +227,26 @@ def document_stats():
         return
     
     try:
-        # Use cached documents if available, otherwise fetch
-        if "user_documents" not in st.session_state:
-            st.session_state.user_documents = api_client.get_documents()
-        
-        documents = st.session_state.user_documents
+        documents = cached_documents(st.session_state.access_token).values()
         
         if not documents:
             st.info("No documents to show stats for")
             return
         
-        # Calculate statistics
+        # Calculate statistics, file type and status distributions in one pass
         total_docs = len(documents)
-        total_chunks = sum(doc['chunk_count'] for doc in documents)
-        total_size = sum(doc['file_size'] for doc in documents) / (1024*1024)  # MB
-        
-        # File type distribution
+        total_chunks = 0
+        total_size_bytes = 0
         file_types = {}
+        statuses = {}
         for doc in documents:
+            total_chunks += doc['chunk_count']
+            total_size_bytes += doc['file_size']
             file_type = doc['file_type'].upper()
             file_types[file_type] = file_types.get(file_type, 0) + 1
-        
-        # Status distribution
-        statuses = {}
-        for doc in documents:
             status = doc['processing_status']
             statuses[status] = statuses.get(status, 0) + 1
+        total_size = total_size_bytes / (1024*1024)  # MB
         
         # Display stats
         st.subheader("📊 Document Statistics")
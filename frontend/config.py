@@ -23,11 +23,12 @@ APP_SIDEBAR_STATE = os.getenv("APP_SIDEBAR_STATE", "expanded")
 
 # Chat Configuration
 MAX_MESSAGE_HISTORY = int(os.getenv("MAX_MESSAGE_HISTORY", "50"))
+CHAT_HISTORY_PAGE_SIZE = int(os.getenv("CHAT_HISTORY_PAGE_SIZE", "20"))
 AUTO_REFRESH_INTERVAL = int(os.getenv("AUTO_REFRESH_INTERVAL", "5"))
 
 # File Upload Configuration
 MAX_FILE_SIZE_MB = int(os.getenv("MAX_FILE_SIZE_MB", "10"))
-ALLOWED_FILE_TYPES = os.getenv("ALLOWED_FILE_TYPES", "pdf,txt,docx,doc").split(",")
+ALLOWED_FILE_TYPES = frozenset(os.getenv("ALLOWED_FILE_TYPES", "pdf,txt,docx,doc").lower().split(","))
 
 # API Endpoints
 AUTH_ENDPOINTS = {
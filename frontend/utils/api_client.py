@@ -2,15 +2,26 @@
 API Client for communicating with FastAPI backend
 """
 import os
+from concurrent.futures import ThreadPoolExecutor
+import orjson
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 import streamlit as st
-from typing import Dict, List, Optional, Any
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from types import MappingProxyType
+from typing import Dict, List, Optional, Any, Iterator, Callable, Mapping
 from config import (
     AUTH_ENDPOINTS, USER_ENDPOINTS, DOCUMENT_ENDPOINTS, CHAT_ENDPOINTS,
     MAX_FILE_SIZE_MB, ALLOWED_FILE_TYPES
 )
+from utils.formatting import short_date
+
+# Headers for requests without authentication; read-only so it can be shared
+JSON_HEADERS = MappingProxyType({
+    "Content-Type": "application/json",
+    "Accept": "application/json"
+})
 
 
 class APIClient:
@@ -20,52 +31,86 @@ class APIClient:
         self.base_url = os.getenv("BACKEND_URL", "http://localhost:8000")
         self.session = requests.Session()
         
-        # Configure retry strategy
+        # Endpoint URLs, built once; per-id ones are bound str.format templates
+        self._chat_start_url = f"{self.base_url}/chat/start"
+        self._chat_history_url = f"{self.base_url}/chat/history"
+        self._selectable_documents_url = f"{self.base_url}/chat/documents/selectable"
+        self._start_document_chat_url = f"{self.base_url}/chat/start-document"
+        self._profile_url = f"{self.base_url}/users/me/profile"
+        self._conversation_url = (self.base_url + "/chat/{}").format
+        self._query_url = (self.base_url + "/chat/{}/query").format
+        self._stream_url = (self.base_url + "/chat/{}/stream").format
+        self._email_url = (self.base_url + "/chat/{}/email").format
+        self._document_url = (DOCUMENT_ENDPOINTS["delete"] + "{}").format
+        
+        # Configure retry strategy for transient failures. POST is left out:
+        # queries, uploads and conversation starts are not safe to replay.
         retry_strategy = Retry(
             total=3,
-            backoff_factor=0.1,
-            status_forcelist=[429, 500, 502, 503, 504],
+            backoff_factor=0.2,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=frozenset(["GET", "DELETE"]),
         )
         
-        # Configure adapter with connection pooling
+        # Configure adapter with connection pooling; one client serves every
+        # Streamlit session, so allow more kept-alive connections per host
         adapter = HTTPAdapter(
             max_retries=retry_strategy,
-            pool_connections=10,
-            pool_maxsize=20
+            pool_connections=8,
+            pool_maxsize=32
         )
         
         self.session.mount("http://", adapter)
         self.session.mount("https://", adapter)
         
-        # Set timeouts
-        self.session.timeout = (5, 30)  # (connect timeout, read timeout)
+        # Timeouts as (connect, read); requests ignores Session.timeout, so
+        # _request passes them on every call
+        self.timeout = (5, 30)
+        self.slow_timeout = (5, 300)  # Uploads and full LLM responses
+    
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request over the pooled session with the default timeout."""
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, url, **kwargs)
+    
+    def _post_json(self, url: str, payload: Any, auth: bool = True, **kwargs) -> requests.Response:
+        """POST a JSON body encoded with orjson rather than requests' stdlib json."""
+        return self._request(
+            "POST",
+            url,
+            data=orjson.dumps(payload),
+            headers=self._get_headers(include_auth=auth),
+            **kwargs
+        )
         
-    def _get_headers(self, include_auth: bool = True) -> Dict[str, str]:
-        """Get request headers with optional authentication."""
-        headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        }
+    def _get_headers(self, include_auth: bool = True) -> Mapping[str, str]:
+        """Get read-only request headers with optional authentication.
         
-        if include_auth and "access_token" in st.session_state:
-            headers["Authorization"] = f"Bearer {st.session_state.access_token}"
+        The authenticated headers are built once per access token and kept in
+        session state; copy them before changing anything.
+        """
+        token = st.session_state.get("access_token") if include_auth else None
+        if token is None:
+            return JSON_HEADERS
         
-        return headers
+        cached = st.session_state.get("_auth_headers")
+        if cached is None or cached[0] != token:
+            cached = (token, MappingProxyType({**JSON_HEADERS, "Authorization": f"Bearer {token}"}))
+            st.session_state._auth_headers = cached
+        return cached[1]
     
     def _handle_response(self, response: requests.Response) -> Dict[str, Any]:
         """Handle API response and return data or raise error."""
         try:
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content)
         except requests.exceptions.HTTPError as e:
-            error_msg = "API Error"
             try:
-                error_data = response.json()
-                error_msg = error_data.get("detail", str(e))
-            except:
+                error_msg = orjson.loads(response.content).get("detail", str(e))
+            except (orjson.JSONDecodeError, AttributeError):
                 error_msg = str(e)
             raise Exception(f"{error_msg} (Status: {response.status_code})")
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             raise Exception(f"Network Error: {str(e)}")
     
     # Authentication Methods
@@ -76,11 +121,10 @@ class APIClient:
             "password": password
         }
         
-        response = self.session.post(
+        response = self._post_json(
             AUTH_ENDPOINTS["login"],
-            json=data,
-            headers=self._get_headers(include_auth=False),
-            timeout=self.session.timeout
+            data,
+            auth=False
         )
         
         return self._handle_response(response)
@@ -93,10 +137,10 @@ class APIClient:
             "name": name
         }
         
-        response = self.session.post(
+        response = self._post_json(
             AUTH_ENDPOINTS["register"],
-            json=data,
-            headers=self._get_headers(include_auth=False)
+            data,
+            auth=False
         )
         
         return self._handle_response(response)
@@ -104,7 +148,8 @@ class APIClient:
     # User Methods
     def get_current_user(self) -> Dict[str, Any]:
         """Get current user information."""
-        response = self.session.get(
+        response = self._request(
+            "GET",
             USER_ENDPOINTS["me"],
             headers=self._get_headers()
         )
@@ -119,20 +164,23 @@ class APIClient:
         }
         
         # Remove Content-Type header for file upload
-        headers = self._get_headers()
+        headers = dict(self._get_headers())
         headers.pop("Content-Type", None)
         
-        response = self.session.post(
+        response = self._request(
+            "POST",
             DOCUMENT_ENDPOINTS["upload"],
             files=files,
-            headers=headers
+            headers=headers,
+            timeout=self.slow_timeout
         )
         
         return self._handle_response(response)
     
     def get_documents(self) -> List[Dict[str, Any]]:
         """Get user's documents."""
-        response = self.session.get(
+        response = self._request(
+            "GET",
             DOCUMENT_ENDPOINTS["list"],
             headers=self._get_headers()
         )
@@ -142,8 +190,9 @@ class APIClient:
     
     def delete_document(self, document_id: str) -> Dict[str, Any]:
         """Delete document."""
-        response = self.session.delete(
-            f"{DOCUMENT_ENDPOINTS['delete']}{document_id}",
+        response = self._request(
+            "DELETE",
+            self._document_url(document_id),
             headers=self._get_headers()
         )
         
@@ -152,8 +201,9 @@ class APIClient:
     # Chat Methods
     def start_conversation(self) -> Dict[str, Any]:
         """Start a new conversation."""
-        response = self.session.post(
-            f"{self.base_url}/chat/start",
+        response = self._request(
+            "POST",
+            self._chat_start_url,
             headers=self._get_headers()
         )
         
@@ -165,27 +215,71 @@ class APIClient:
             "content": message
         }
         
-        response = self.session.post(
-            f"{self.base_url}/chat/{conversation_id}/query",
-            json=data,
-            headers=self._get_headers()
+        response = self._post_json(
+            self._query_url(conversation_id),
+            data,
+            timeout=self.slow_timeout
         )
         
         return self._handle_response(response)
     
-    def get_chat_history(self) -> List[Dict[str, Any]]:
-        """Get chat history."""
-        response = self.session.get(
-            f"{self.base_url}/chat/history",
+    def stream_message(self, conversation_id: str, message: str) -> Iterator[Dict[str, Any]]:
+        """Send message to a conversation and yield response events as they stream in.
+        
+        Yields {"type": "chunk", "content": ...} events, then a final
+        {"type": "done", ...} event with the response metadata.
+        """
+        data = {
+            "content": message
+        }
+        
+        response = self._post_json(
+            self._stream_url(conversation_id),
+            data,
+            stream=True
+        )
+        
+        with response:
+            if not response.ok:
+                self._handle_response(response)
+            
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                event = orjson.loads(line)
+                if event.get("type") == "error":
+                    raise Exception(event.get("detail", "Streaming failed"))
+                yield event
+    
+    def get_chat_history(self, limit: int = 20, skip: int = 0) -> List[Dict[str, Any]]:
+        """Get one page of chat history, most recent first."""
+        response = self._request(
+            "GET",
+            self._chat_history_url,
+            params={"limit": limit, "skip": skip},
             headers=self._get_headers()
         )
         
-        return self._handle_response(response)
+        conversations = self._handle_response(response)
+        # Precompute the date label once per fetch rather than on every rerun
+        for conversation in conversations:
+            conversation["created_label"] = short_date(conversation.get("created_at"))
+        return conversations
     
-    def get_conversation(self, conversation_id: str) -> Dict[str, Any]:
-        """Get specific conversation with messages."""
-        response = self.session.get(
-            f"{self.base_url}/chat/{conversation_id}",
+    def get_conversation(
+        self, conversation_id: str, limit: Optional[int] = None, before: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get specific conversation with messages, optionally only the latest page before a timestamp."""
+        params = {}
+        if limit is not None:
+            params["limit"] = limit
+        if before is not None:
+            params["before"] = before
+        
+        response = self._request(
+            "GET",
+            self._conversation_url(conversation_id),
+            params=params,
             headers=self._get_headers()
         )
         
@@ -193,8 +287,9 @@ class APIClient:
     
     def delete_conversation(self, conversation_id: str) -> Dict[str, Any]:
         """Delete a conversation."""
-        response = self.session.delete(
-            f"{self.base_url}/chat/{conversation_id}",
+        response = self._request(
+            "DELETE",
+            self._conversation_url(conversation_id),
             headers=self._get_headers()
         )
         
@@ -205,8 +300,9 @@ class APIClient:
     # Profile Methods
     def get_user_profile(self) -> Dict[str, Any]:
         """Get user profile with statistics."""
-        response = self.session.get(
-            f"{self.base_url}/users/me/profile",
+        response = self._request(
+            "GET",
+            self._profile_url,
             headers=self._get_headers()
         )
         
@@ -215,8 +311,9 @@ class APIClient:
     # Document Chat Methods
     def get_selectable_documents(self) -> List[Dict[str, Any]]:
         """Get documents available for document chat."""
-        response = self.session.get(
-            f"{self.base_url}/chat/documents/selectable",
+        response = self._request(
+            "GET",
+            self._selectable_documents_url,
             headers=self._get_headers()
         )
         
@@ -228,48 +325,86 @@ class APIClient:
             "document_ids": document_ids
         }
         
-        response = self.session.post(
-            f"{self.base_url}/chat/start-document",
-            json=data,
-            headers=self._get_headers()
+        response = self._post_json(
+            self._start_document_chat_url,
+            data
         )
         
         return self._handle_response(response)
     
     # Utility Methods
+    def fetch_parallel(self, tasks: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+        """Run independent calls concurrently and return their results by name.
+        
+        Worker threads are given the calling script's run context, so calls can
+        read st.session_state (the auth token) and use st.cache_data as usual.
+        """
+        ctx = get_script_run_ctx()
+        with ThreadPoolExecutor(
+            max_workers=min(8, len(tasks)),
+            initializer=add_script_run_ctx,
+            initargs=(None, ctx)
+        ) as executor:
+            futures = {name: executor.submit(task) for name, task in tasks.items()}
+            return {name: future.result() for name, future in futures.items()}
+    
+    def get_history_and_conversation(
+        self, conversation_id: str, history_limit: int = 20, message_limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Get the first chat history page and a conversation concurrently.
+        
+        Returns {"history": [...], "conversation": {...}}.
+        """
+        return self.fetch_parallel({
+            "history": lambda: self.get_chat_history(limit=history_limit),
+            "conversation": lambda: self.get_conversation(conversation_id, limit=message_limit),
+        })
+    
     def validate_file(self, file) -> tuple[bool, str]:
         """Validate uploaded file."""
         if file is None:
             return False, "No file selected"
         
-        # Check file size
-        file_size_mb = len(file.getvalue()) / (1024 * 1024)
+        # Check file size without reading the bytes: UploadedFile knows its
+        # size, and any other file object can report it by seeking to the end
+        try:
+            size_bytes = file.size
+        except AttributeError:
+            file.seek(0, 2)
+            size_bytes = file.tell()
+            file.seek(0)
+        file_size_mb = size_bytes / (1024 * 1024)
         if file_size_mb > MAX_FILE_SIZE_MB:
             return False, f"File size ({file_size_mb:.1f}MB) exceeds limit ({MAX_FILE_SIZE_MB}MB)"
         
         # Check file type
-        file_extension = file.name.split('.')[-1].lower()
+        file_extension = file.name.rsplit('.', 1)[-1].lower()
         if file_extension not in ALLOWED_FILE_TYPES:
-            return False, f"File type '{file_extension}' not allowed. Allowed: {', '.join(ALLOWED_FILE_TYPES)}"
+            return False, f"File type '{file_extension}' not allowed. Allowed: {', '.join(sorted(ALLOWED_FILE_TYPES))}"
         
         return True, "File is valid"
     
     def email_chat_summary(self, conversation_id: str) -> Dict[str, Any]:
         """Send chat summary via email."""
-        response = self.session.post(
-            f"{self.base_url}/chat/{conversation_id}/email",
-            headers=self._get_headers()
+        response = self._request(
+            "POST",
+            self._email_url(conversation_id),
+            headers=self._get_headers(),
+            timeout=self.slow_timeout
         )
         return self._handle_response(response)
     
     def delete_profile(self) -> Dict[str, Any]:
         """Delete user profile and all associated data."""
-        response = self.session.delete(
-            f"{self.base_url}/users/me/profile",
+        response = self._request(
+            "DELETE",
+            self._profile_url,
             headers=self._get_headers()
         )
         return self._handle_response(response)
 
 
-# Global API client instance
-api_client = APIClient()
+@st.cache_resource
+def get_api_client() -> APIClient:
+    """Return the API client shared by every session (one pooled HTTP session)."""
+    return APIClient()
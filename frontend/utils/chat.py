@@ -0,0 +1,23 @@
+"""
+Chat message types shared across reruns
+"""
+import html
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class Turn:
+    """A single chat message held in session state."""
+    role: str  # "user" or "assistant"
+    content: str
+    html: str = ""  # Output of message_html(content), ready to render
+
+
+def message_html(text: str) -> str:
+    """Escape message text for a chat bubble, keeping it on one line.
+
+    Bubbles are rendered as markdown HTML blocks, which end at a blank line,
+    so line breaks become <br> tags instead of staying in the source.
+    """
+    text = html.escape(text).replace("\r\n", "\n").replace("\r", "\n")
+    return text.replace("\n", "<br>")
@@ -0,0 +1,12 @@
+"""
+Display formatting helpers
+"""
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional, Union
+
+
+@lru_cache(maxsize=1024)
+def short_date(timestamp: Optional[Union[str, datetime]]) -> str:
+    """Return the YYYY-MM-DD part of an ISO timestamp or datetime, or "Unknown"."""
+    return str(timestamp)[:10] if timestamp else "Unknown"